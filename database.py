@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime
+from sqlalchemy import create_engine, Column, Integer, String, Text, Float, DateTime, Index
 from sqlalchemy.orm import declarative_base, sessionmaker
 from datetime import datetime, timezone
 import os
@@ -50,6 +50,40 @@ class Resume(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 
+ENTITY_MODELS = {
+    "vacancy": Vacancy,
+    "resume": Resume,
+}
+
+
+class MinHashSignature(Base):
+    """MinHash-подпись объекта для поиска почти-дубликатов"""
+    __tablename__ = "minhash_signatures"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String, nullable=False)  # vacancy/resume
+    object_id = Column(Integer, nullable=False)
+    signature = Column(Text, nullable=False)  # значения через запятую
+    duplicate_of = Column(Integer, nullable=True)  # ID наиболее похожего более раннего объекта
+
+    __table_args__ = (Index("ix_minhash_entity_object", "entity", "object_id", unique=True),)
+
+
+class LshBucket(Base):
+    """Корзина LSH-индекса: одна строка на полосу подписи"""
+    __tablename__ = "lsh_buckets"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String, nullable=False)
+    bucket = Column(String, nullable=False)  # номер полосы и хеш её значений
+    object_id = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index("ix_lsh_entity_bucket", "entity", "bucket"),
+        Index("ix_lsh_entity_object", "entity", "object_id"),
+    )
+
+
 def get_db():
     """Dependency для получения сессии БД"""
     db = SessionLocal()
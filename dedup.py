@@ -0,0 +1,261 @@
+"""Поиск почти-дубликатов вакансий и резюме (MinHash + LSH).
+
+Запуск как скрипта выполняет офлайн-проход: перестраивает LSH-индекс
+по существующим записям и группирует их в кластеры дубликатов.
+"""
+import argparse
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+import database
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 2  # слов в шингле
+THRESHOLD = 0.8
+
+ENTITY_FIELDS = {
+    "vacancy": ("title", "company", "description"),
+    "resume": ("full_name", "email", "about"),
+}
+MAX_TEXT_LENGTH = 3000  # только для подписи; подтверждение идёт по полному тексту
+ESTIMATE_THRESHOLD = 0.5  # порог оценки по подписи для отбора кандидатов
+_MIX = 0x9E3779B97F4A7C15
+_MASK = (1 << 64) - 1
+_BIN_BITS = NUM_PERM.bit_length() - 1
+_DENSIFY_OFFSET = 1 << (64 - _BIN_BITS)
+
+
+def normalize(text: str, max_length: Optional[int] = None) -> List[str]:
+    """Слова текста в нижнем регистре, без знаков препинания"""
+    return re.findall(r"\w+", text[:max_length].lower())
+
+
+def shingles(text: str, max_length: Optional[int] = None) -> set:
+    """Пары соседних слов нормализованного текста"""
+    words = normalize(text, max_length)
+    if len(words) < SHINGLE_SIZE:
+        return {" ".join(words)}
+    return {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def entity_text(entity: str, values: Dict[str, Optional[str]]) -> str:
+    return " ".join(str(values.get(field) or "") for field in ENTITY_FIELDS[entity])
+
+
+def entity_values(entity: str, obj) -> Dict[str, Optional[str]]:
+    return {field: getattr(obj, field) for field in ENTITY_FIELDS[entity]}
+
+
+def compute_signature(entity: str, values: Dict[str, Optional[str]]) -> List[int]:
+    """MinHash-подпись по ключевым полям объекта.
+
+    Используется хеширование с одной перестановкой: каждый шингл
+    хешируется один раз (crc32 и перемешивание), младшие биты хеша
+    выбирают ячейку подписи, старшие - значение. Пустые ячейки
+    заполняются из следующей непустой (densification). Для коротких
+    текстов оценка по такой подписи шумная, поэтому она служит только
+    для отбора кандидатов (см. find_duplicate).
+    """
+    text = entity_text(entity, values)
+    hashes = sorted(
+        ((zlib.crc32(s.encode()) * _MIX) & _MASK for s in shingles(text, MAX_TEXT_LENGTH)),
+        reverse=True
+    )
+    bins = {h & (NUM_PERM - 1): h >> _BIN_BITS for h in hashes}
+
+    signature = []
+    for i in range(NUM_PERM):
+        step = 0
+        while (i + step) % NUM_PERM not in bins:
+            step += 1
+        signature.append(bins[(i + step) % NUM_PERM] + step * _DENSIFY_OFFSET)
+    return signature
+
+
+def bucket_keys(signature: List[int]) -> List[str]:
+    """Ключи корзин LSH: по одному на полосу из ROWS значений"""
+    keys = []
+    for band in range(BANDS):
+        chunk = ",".join(map(str, signature[band * ROWS:(band + 1) * ROWS]))
+        keys.append(f"{band}:{hashlib.blake2b(chunk.encode(), digest_size=8).hexdigest()}")
+    return keys
+
+
+def similarity(a: List[int], b: List[int]) -> float:
+    """Оценка коэффициента Жаккара по двум подписям"""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def jaccard(a: set, b: set) -> float:
+    """Точный коэффициент Жаккара двух множеств шинглов"""
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
+def find_duplicate(
+    db: Session,
+    entity: str,
+    values: Dict[str, Optional[str]],
+    signature: List[int],
+    exclude_id: Optional[int] = None
+) -> Optional[int]:
+    """ID наиболее похожего существующего объекта или None.
+
+    Кандидаты из LSH-индекса отбираются по оценке подписи, затем для
+    каждого считается точный коэффициент Жаккара по полному тексту.
+    Записи индекса без объекта удаляются.
+    """
+    candidate_ids = {
+        row.object_id
+        for row in db.query(database.LshBucket.object_id).filter(
+            database.LshBucket.entity == entity,
+            database.LshBucket.bucket.in_(bucket_keys(signature))
+        )
+    }
+    candidate_ids.discard(exclude_id)
+    if not candidate_ids:
+        return None
+
+    candidate_ids = [
+        record.object_id
+        for record in db.query(database.MinHashSignature).filter(
+            database.MinHashSignature.entity == entity,
+            database.MinHashSignature.object_id.in_(candidate_ids)
+        )
+        if similarity(signature, [int(v) for v in record.signature.split(",")]) >= ESTIMATE_THRESHOLD
+    ]
+    if not candidate_ids:
+        return None
+
+    model = database.ENTITY_MODELS[entity]
+    rows = {obj.id: obj for obj in db.query(model).filter(model.id.in_(candidate_ids))}
+    target = shingles(entity_text(entity, values))
+    best, best_score = None, 0.0
+    for object_id in sorted(candidate_ids):
+        obj = rows.get(object_id)
+        if obj is None:
+            remove_object(db, entity, object_id)
+            continue
+        score = jaccard(target, shingles(entity_text(entity, entity_values(entity, obj))))
+        if score >= THRESHOLD and score > best_score:
+            best, best_score = object_id, score
+    return best
+
+
+def remove_object(db: Session, entity: str, object_id: int):
+    """Удаление объекта из индекса"""
+    db.query(database.LshBucket).filter(
+        database.LshBucket.entity == entity,
+        database.LshBucket.object_id == object_id
+    ).delete(synchronize_session=False)
+    db.query(database.MinHashSignature).filter(
+        database.MinHashSignature.entity == entity,
+        database.MinHashSignature.object_id == object_id
+    ).delete(synchronize_session=False)
+    db.query(database.MinHashSignature).filter(
+        database.MinHashSignature.entity == entity,
+        database.MinHashSignature.duplicate_of == object_id
+    ).update({"duplicate_of": None}, synchronize_session=False)
+
+
+def index_object(
+    db: Session,
+    entity: str,
+    object_id: int,
+    signature: List[int],
+    duplicate_of: Optional[int] = None
+):
+    """Добавление (или переиндексация) объекта в LSH-индексе"""
+    record = db.query(database.MinHashSignature).filter(
+        database.MinHashSignature.entity == entity,
+        database.MinHashSignature.object_id == object_id
+    ).first()
+    if record is None:
+        record = database.MinHashSignature(entity=entity, object_id=object_id)
+        db.add(record)
+    record.signature = ",".join(map(str, signature))
+    record.duplicate_of = duplicate_of
+
+    db.query(database.LshBucket).filter(
+        database.LshBucket.entity == entity,
+        database.LshBucket.object_id == object_id
+    ).delete(synchronize_session=False)
+    db.add_all(
+        database.LshBucket(entity=entity, bucket=key, object_id=object_id)
+        for key in bucket_keys(signature)
+    )
+    db.flush()
+
+
+def reindex_object(db: Session, entity: str, obj, signature: Optional[List[int]] = None):
+    """Переиндексация изменённого объекта.
+
+    Связь duplicate_of пересчитывается по новому содержимому, а объекты,
+    помеченные как его дубликаты и больше на него не похожие, отвязываются.
+    """
+    values = entity_values(entity, obj)
+    if signature is None:
+        signature = compute_signature(entity, values)
+    duplicate_of = find_duplicate(db, entity, values, signature, exclude_id=obj.id)
+    index_object(db, entity, obj.id, signature, duplicate_of=duplicate_of)
+
+    children = db.query(database.MinHashSignature).filter(
+        database.MinHashSignature.entity == entity,
+        database.MinHashSignature.duplicate_of == obj.id
+    ).all()
+    if not children:
+        return
+    model = database.ENTITY_MODELS[entity]
+    rows = {row.id: row for row in db.query(model).filter(model.id.in_([c.object_id for c in children]))}
+    target = shingles(entity_text(entity, values))
+    for child in children:
+        row = rows.get(child.object_id)
+        if row is None or jaccard(target, shingles(entity_text(entity, entity_values(entity, row)))) < THRESHOLD:
+            child.duplicate_of = None
+    db.flush()
+
+
+def cluster_existing(db: Session, entity: str) -> Dict[int, List[int]]:
+    """Перестроение индекса по всем записям; возвращает кластеры {исходный ID: [дубликаты]}"""
+    db.query(database.LshBucket).filter(database.LshBucket.entity == entity).delete()
+    db.query(database.MinHashSignature).filter(database.MinHashSignature.entity == entity).delete()
+
+    model = database.ENTITY_MODELS[entity]
+    clusters, roots = {}, {}
+    for obj in db.query(model).order_by(model.id).all():
+        values = entity_values(entity, obj)
+        signature = compute_signature(entity, values)
+        duplicate_of = find_duplicate(db, entity, values, signature)
+        index_object(db, entity, obj.id, signature, duplicate_of=duplicate_of)
+        if duplicate_of is not None:
+            roots[obj.id] = roots.get(duplicate_of, duplicate_of)
+            clusters.setdefault(roots[obj.id], []).append(obj.id)
+    db.commit()
+    return clusters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Поиск почти-дубликатов в существующих записях")
+    parser.add_argument("--entity", choices=sorted(ENTITY_FIELDS), action="append")
+    args = parser.parse_args()
+
+    database.init_db()
+    db = database.SessionLocal()
+    try:
+        for entity in args.entity or sorted(ENTITY_FIELDS):
+            clusters = cluster_existing(db, entity)
+            duplicates = sum(len(ids) for ids in clusters.values())
+            print(f"{entity}: кластеров {len(clusters)}, дубликатов {duplicates}")
+            for original_id, ids in sorted(clusters.items()):
+                print(f"  {original_id}: {', '.join(map(str, ids))}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
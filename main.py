@@ -1,10 +1,13 @@
-from fastapi import FastAPI, Depends, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
 from sqlalchemy.orm import Session
+from pydantic import ValidationError
 from typing import List, Optional
 import database
+import dedup
 import schemas
 from database import get_db, init_db
 
@@ -19,14 +22,180 @@ init_db()
 templates = Jinja2Templates(directory="templates")
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
+MAX_BATCH_IDS = 100
+
+DUPLICATES_DESCRIPTION = (
+    "Обработка почти-дубликатов (flag - создать и вернуть X-Duplicate-Of, "
+    "merge - обновить найденный объект, reject - 409). Дубликатом считается "
+    f"объект с коэффициентом Жаккара по полному тексту не ниже {dedup.THRESHOLD}; "
+    f"LSH-подпись строится по первым {dedup.MAX_TEXT_LENGTH} символам, "
+    "окончательная проверка - по полному тексту"
+)
+
+ENTITIES = {
+    "vacancy": {
+        "create": schemas.VacancyCreate,
+        "update": schemas.VacancyUpdate,
+        "response": schemas.VacancyResponse,
+        "not_found": "Вакансия не найдена",
+    },
+    "resume": {
+        "create": schemas.ResumeCreate,
+        "update": schemas.ResumeUpdate,
+        "response": schemas.ResumeResponse,
+        "not_found": "Резюме не найдено",
+    },
+}
+
+
+def parse_ids(ids: str) -> List[int]:
+    """Разбор списка ID через запятую с сохранением порядка и без повторов"""
+    result = {}
+    for part in ids.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            value = int(part)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Некорректный ID: {part}")
+        result[value] = None
+        if len(result) > MAX_BATCH_IDS:
+            raise HTTPException(status_code=400, detail=f"Не более {MAX_BATCH_IDS} ID за запрос")
+    if not result:
+        raise HTTPException(status_code=400, detail="Не указаны ID")
+    return list(result)
+
+
+def fetch_by_ids(db: Session, model, ids: List[int]) -> dict:
+    """Загрузка объектов одним запросом IN, результат - словарь по ID"""
+    if not ids:
+        return {}
+    return {obj.id: obj for obj in db.query(model).filter(model.id.in_(ids)).all()}
+
+
+def create_object(db: Session, entity: str, payload, duplicates: str):
+    """Создание объекта с проверкой на почти-дубликаты.
+
+    Возвращает (объект, создан ли новый, ID найденного дубликата).
+    При слиянии в найденный объект переносятся только переданные поля.
+    """
+    model = database.ENTITY_MODELS[entity]
+    data = payload.model_dump()
+    signature = dedup.compute_signature(entity, data)
+    duplicate_of = dedup.find_duplicate(db, entity, data, signature)
+
+    if duplicate_of is not None and duplicates == "reject":
+        raise HTTPException(
+            status_code=409,
+            detail=f"Найден почти-дубликат: {duplicate_of}",
+            headers={"X-Duplicate-Of": str(duplicate_of)}
+        )
+    if duplicate_of is not None and duplicates == "merge":
+        obj = db.query(model).filter(model.id == duplicate_of).first()
+        for field, value in payload.model_dump(exclude_unset=True).items():
+            setattr(obj, field, value)
+        db.flush()
+        dedup.reindex_object(db, entity, obj)
+        return obj, False, duplicate_of
+
+    obj = model(**data)
+    db.add(obj)
+    db.flush()
+    dedup.index_object(db, entity, obj.id, signature, duplicate_of=duplicate_of)
+    return obj, True, duplicate_of
+
+
+@app.post("/api/batch", response_model=schemas.BatchResponse)
+def execute_batch(
+    batch: schemas.BatchRequest,
+    duplicates: schemas.DuplicatePolicy = Query("flag", description=DUPLICATES_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
+    """Выполнение списка операций в одной транзакции.
+
+    При первой ошибке транзакция откатывается и возвращается её код,
+    committed=false и результаты операций до ошибки включительно.
+    """
+    existing = {}
+    for entity in ENTITIES:
+        ids = [op.id for op in batch.operations if op.entity == entity and op.id is not None]
+        existing[entity] = fetch_by_ids(db, database.ENTITY_MODELS[entity], ids)
+
+    results = []
+    for index, op in enumerate(batch.operations):
+        config = ENTITIES[op.entity]
+        try:
+            duplicate_of = None
+            if op.action == "create":
+                payload = config["create"].model_validate(op.data or {})
+                obj, created, duplicate_of = create_object(db, op.entity, payload, duplicates)
+                existing[op.entity][obj.id] = obj
+                status_code = 201 if created else 200
+            else:
+                if op.id is None:
+                    raise HTTPException(status_code=422, detail="Не указан ID")
+                obj = existing[op.entity].get(op.id)
+                if obj is None:
+                    raise HTTPException(status_code=404, detail=config["not_found"])
+                if op.action == "update":
+                    payload = config["update"].model_validate(op.data or {})
+                    update_data = payload.model_dump(exclude_unset=True)
+                    for field, value in update_data.items():
+                        setattr(obj, field, value)
+                    db.flush()
+                    if update_data.keys() & dedup.ENTITY_FIELDS[op.entity]:
+                        dedup.reindex_object(db, op.entity, obj)
+                    status_code = 200
+                else:
+                    db.delete(obj)
+                    dedup.remove_object(db, op.entity, obj.id)
+                    db.flush()
+                    del existing[op.entity][op.id]
+                    status_code = 204
+        except (HTTPException, ValidationError, IntegrityError, DataError) as exc:
+            db.rollback()
+            if isinstance(exc, ValidationError):
+                status_code, detail = 422, exc.errors(include_url=False, include_context=False)
+            elif isinstance(exc, (IntegrityError, DataError)):
+                status_code, detail = 400, "Данные нарушают ограничения базы данных"
+            else:
+                status_code, detail = exc.status_code, exc.detail
+                duplicate_of = (exc.headers or {}).get("X-Duplicate-Of")
+            results.append(schemas.BatchOperationResult(
+                index=index, status_code=status_code, id=op.id, duplicate_of=duplicate_of, detail=detail
+            ))
+            content = schemas.BatchResponse(committed=False, results=results)
+            return JSONResponse(status_code=status_code, content=content.model_dump(mode="json"))
+        except SQLAlchemyError:
+            db.rollback()
+            raise
+
+        data = None
+        if op.action != "delete":
+            data = config["response"].model_validate(obj).model_dump(mode="json")
+        results.append(schemas.BatchOperationResult(
+            index=index, status_code=status_code, id=obj.id, data=data, duplicate_of=duplicate_of
+        ))
+
+    db.commit()
+    return schemas.BatchResponse(committed=True, results=results)
 
 
 @app.post("/api/vacancies/", response_model=schemas.VacancyResponse, status_code=201)
-def create_vacancy(vacancy: schemas.VacancyCreate, db: Session = Depends(get_db)):
-    db_vacancy = database.Vacancy(**vacancy.model_dump())
-    db.add(db_vacancy)
+def create_vacancy(
+    vacancy: schemas.VacancyCreate,
+    response: Response,
+    duplicates: schemas.DuplicatePolicy = Query("flag", description=DUPLICATES_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
+    db_vacancy, created, duplicate_of = create_object(db, "vacancy", vacancy, duplicates)
     db.commit()
     db.refresh(db_vacancy)
+    if duplicate_of is not None:
+        response.headers["X-Duplicate-Of"] = str(duplicate_of)
+    if not created:
+        response.status_code = 200
     return db_vacancy
 
 
@@ -40,6 +209,19 @@ def get_vacancies(
     return vacancies
 
 
+@app.get("/api/vacancies/batch", response_model=schemas.VacancyBatchResponse)
+def get_vacancies_batch(
+    ids: str = Query(..., description="ID вакансий через запятую"),
+    db: Session = Depends(get_db)
+):
+    vacancy_ids = parse_ids(ids)
+    found = fetch_by_ids(db, database.Vacancy, vacancy_ids)
+    return {
+        "items": [found[i] for i in vacancy_ids if i in found],
+        "missing": [i for i in vacancy_ids if i not in found],
+    }
+
+
 @app.get("/api/vacancies/{vacancy_id}", response_model=schemas.VacancyResponse)
 def get_vacancy(vacancy_id: int, db: Session = Depends(get_db)):
     vacancy = db.query(database.Vacancy).filter(database.Vacancy.id == vacancy_id).first()
@@ -61,6 +243,8 @@ def update_vacancy(
     update_data = vacancy_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(vacancy, field, value)
+    if update_data.keys() & dedup.ENTITY_FIELDS["vacancy"]:
+        dedup.reindex_object(db, "vacancy", vacancy)
     
     db.commit()
     db.refresh(vacancy)
@@ -74,6 +258,7 @@ def delete_vacancy(vacancy_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Вакансия не найдена")
     
     db.delete(vacancy)
+    dedup.remove_object(db, "vacancy", vacancy.id)
     db.commit()
     return None
 
@@ -121,11 +306,19 @@ def search_vacancies(
 
 
 @app.post("/api/resumes/", response_model=schemas.ResumeResponse, status_code=201)
-def create_resume(resume: schemas.ResumeCreate, db: Session = Depends(get_db)):
-    db_resume = database.Resume(**resume.model_dump())
-    db.add(db_resume)
+def create_resume(
+    resume: schemas.ResumeCreate,
+    response: Response,
+    duplicates: schemas.DuplicatePolicy = Query("flag", description=DUPLICATES_DESCRIPTION),
+    db: Session = Depends(get_db)
+):
+    db_resume, created, duplicate_of = create_object(db, "resume", resume, duplicates)
     db.commit()
     db.refresh(db_resume)
+    if duplicate_of is not None:
+        response.headers["X-Duplicate-Of"] = str(duplicate_of)
+    if not created:
+        response.status_code = 200
     return db_resume
 
 
@@ -139,6 +332,19 @@ def get_resumes(
     return resumes
 
 
+@app.get("/api/resumes/batch", response_model=schemas.ResumeBatchResponse)
+def get_resumes_batch(
+    ids: str = Query(..., description="ID резюме через запятую"),
+    db: Session = Depends(get_db)
+):
+    resume_ids = parse_ids(ids)
+    found = fetch_by_ids(db, database.Resume, resume_ids)
+    return {
+        "items": [found[i] for i in resume_ids if i in found],
+        "missing": [i for i in resume_ids if i not in found],
+    }
+
+
 @app.get("/api/resumes/{resume_id}", response_model=schemas.ResumeResponse)
 def get_resume(resume_id: int, db: Session = Depends(get_db)):
     resume = db.query(database.Resume).filter(database.Resume.id == resume_id).first()
@@ -160,6 +366,8 @@ def update_resume(
     update_data = resume_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(resume, field, value)
+    if update_data.keys() & dedup.ENTITY_FIELDS["resume"]:
+        dedup.reindex_object(db, "resume", resume)
     
     db.commit()
     db.refresh(resume)
@@ -173,6 +381,7 @@ def delete_resume(resume_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Резюме не найдено")
     
     db.delete(resume)
+    dedup.remove_object(db, "resume", resume.id)
     db.commit()
     return None
 
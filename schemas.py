@@ -1,8 +1,11 @@
 from pydantic import BaseModel, Field, EmailStr
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
 
 
+DuplicatePolicy = Literal["flag", "merge", "reject"]
+
+
 class VacancyBase(BaseModel):
     title: str = Field(..., min_length=1, max_length=200, description="Название вакансии")
     company: str = Field(..., min_length=1, max_length=200, description="Название компании")
@@ -75,3 +78,38 @@ class ResumeResponse(ResumeBase):
     created_at: datetime
     
     model_config = {"from_attributes": True}
+
+
+class VacancyBatchResponse(BaseModel):
+    items: List[VacancyResponse]
+    missing: List[int]
+
+
+class ResumeBatchResponse(BaseModel):
+    items: List[ResumeResponse]
+    missing: List[int]
+
+
+class BatchOperation(BaseModel):
+    entity: Literal["vacancy", "resume"] = Field(..., description="Тип объекта")
+    action: Literal["create", "update", "delete"] = Field(..., description="Операция")
+    id: Optional[int] = Field(None, description="ID объекта (для update/delete)")
+    data: Optional[Dict[str, Any]] = Field(None, description="Данные (для create/update)")
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=100)
+
+
+class BatchOperationResult(BaseModel):
+    index: int
+    status_code: int
+    id: Optional[int] = None
+    data: Optional[Dict[str, Any]] = None
+    duplicate_of: Optional[int] = None
+    detail: Optional[Any] = None
+
+
+class BatchResponse(BaseModel):
+    committed: bool
+    results: List[BatchOperationResult]
@@ -1,6 +1,9 @@
 // API базовый URL
 const API_URL = '/api/resumes';
 
+// Последние загруженные объекты по ID (для формы редактирования без лишнего GET)
+const resumesCache = new Map();
+
 // Загрузка резюме при загрузке страницы
 document.addEventListener('DOMContentLoaded', () => {
     loadResumes();
@@ -20,6 +23,9 @@ async function loadResumes() {
 
 // Отображение резюме
 function displayResumes(resumes) {
+    resumesCache.clear();
+    resumes.forEach(item => resumesCache.set(item.id, item));
+    
     const container = document.getElementById('resumesList');
     
     if (resumes.length === 0) {
@@ -150,8 +156,11 @@ function showCreateResumeForm() {
 // Редактирование резюме
 async function editResume(id) {
     try {
-        const response = await fetch(API_URL + `/${id}`);
-        const resume = await response.json();
+        let resume = resumesCache.get(id);
+        if (!resume) {
+            const response = await fetch(API_URL + `/${id}`);
+            resume = await response.json();
+        }
         
         document.getElementById('modalTitle').textContent = 'Редактировать резюме';
         document.getElementById('resumeId').value = resume.id;
@@ -1,6 +1,9 @@
 // API базовый URL
 const API_URL = '/api/vacancies';
 
+// Последние загруженные объекты по ID (для формы редактирования без лишнего GET)
+const vacanciesCache = new Map();
+
 // Загрузка вакансий при загрузке страницы
 document.addEventListener('DOMContentLoaded', () => {
     loadVacancies();
@@ -20,6 +23,9 @@ async function loadVacancies() {
 
 // Отображение вакансий
 function displayVacancies(vacancies) {
+    vacanciesCache.clear();
+    vacancies.forEach(item => vacanciesCache.set(item.id, item));
+    
     const container = document.getElementById('vacanciesList');
     
     if (vacancies.length === 0) {
@@ -134,8 +140,11 @@ function showCreateVacancyForm() {
 // Редактирование вакансии
 async function editVacancy(id) {
     try {
-        const response = await fetch(API_URL + `/${id}`);
-        const vacancy = await response.json();
+        let vacancy = vacanciesCache.get(id);
+        if (!vacancy) {
+            const response = await fetch(API_URL + `/${id}`);
+            vacancy = await response.json();
+        }
         
         document.getElementById('modalTitle').textContent = 'Редактировать вакансию';
         document.getElementById('vacancyId').value = vacancy.id;
@@ -4,6 +4,8 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from database import Base, get_db
 from main import app
+import database
+import dedup
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
@@ -308,3 +310,322 @@ def test_resume_validation(client):
         "email": "invalid-email"
     })
     assert response.status_code == 422
+
+
+def test_get_vacancies_batch(client):
+    ids = []
+    for i in range(3):
+        response = client.post("/api/vacancies/", json={
+            "title": f"Vacancy {i}",
+            "company": f"Company {i}",
+            "description": f"Description {i}",
+            "location": "Москва",
+            "employment_type": "Полная",
+            "experience": "1-3 года"
+        })
+        ids.append(response.json()["id"])
+    
+    response = client.get(f"/api/vacancies/batch?ids={ids[2]},999,{ids[0]}")
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [ids[2], ids[0]]
+    assert data["missing"] == [999]
+    
+    response = client.get("/api/vacancies/batch?ids=1,abc")
+    assert response.status_code == 400
+
+
+def test_get_resumes_batch(client):
+    create_response = client.post("/api/resumes/", json={
+        "full_name": "Test Person",
+        "position": "Test Position",
+        "about": "Test About Me",
+        "location": "Москва",
+        "employment_type": "Полная",
+        "experience_years": "1-3 года",
+        "email": "test@example.com"
+    })
+    resume_id = create_response.json()["id"]
+    
+    response = client.get(f"/api/resumes/batch?ids=42,{resume_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert [item["id"] for item in data["items"]] == [resume_id]
+    assert data["missing"] == [42]
+
+
+def test_batch_operations(client):
+    create_response = client.post("/api/vacancies/", json={
+        "title": "Old Title",
+        "company": "Test Company",
+        "description": "Test Description",
+        "location": "Москва",
+        "employment_type": "Полная",
+        "experience": "1-3 года"
+    })
+    vacancy_id = create_response.json()["id"]
+    
+    response = client.post("/api/batch", json={"operations": [
+        {"entity": "vacancy", "action": "update", "id": vacancy_id, "data": {"title": "New Title"}},
+        {"entity": "resume", "action": "create", "data": {
+            "full_name": "Test Person",
+            "position": "Test Position",
+            "about": "Test About Me",
+            "location": "Москва",
+            "employment_type": "Полная",
+            "experience_years": "1-3 года",
+            "email": "test@example.com"
+        }},
+    ]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["committed"] is True
+    assert [r["status_code"] for r in data["results"]] == [200, 201]
+    assert data["results"][0]["data"]["title"] == "New Title"
+    resume_id = data["results"][1]["id"]
+    assert client.get(f"/api/resumes/{resume_id}").status_code == 200
+    
+    response = client.post("/api/batch", json={"operations": [
+        {"entity": "vacancy", "action": "delete", "id": vacancy_id},
+        {"entity": "resume", "action": "delete", "id": 999},
+    ]})
+    assert response.status_code == 404
+    data = response.json()
+    assert data["committed"] is False
+    assert data["results"][1]["status_code"] == 404
+    assert client.get(f"/api/vacancies/{vacancy_id}").status_code == 200
+
+
+def test_vacancy_near_duplicates(client):
+    vacancy_data = {
+        "title": "Python Developer",
+        "company": "Tech Company",
+        "description": "Ищем опытного Python разработчика в команду бэкенда, удаленная работа",
+        "location": "Москва",
+        "employment_type": "Полная",
+        "experience": "3-6 лет"
+    }
+    original_id = client.post("/api/vacancies/", json=vacancy_data).json()["id"]
+    
+    repost = dict(vacancy_data, description=vacancy_data["description"] + "!")
+    response = client.post("/api/vacancies/", json=repost)
+    assert response.status_code == 201
+    assert response.headers["X-Duplicate-Of"] == str(original_id)
+    
+    response = client.post("/api/vacancies/?duplicates=reject", json=repost)
+    assert response.status_code == 409
+    
+    response = client.post("/api/vacancies/?duplicates=merge", json=dict(repost, location="Казань"))
+    assert response.status_code == 200
+    assert response.json()["id"] == original_id
+    assert response.json()["location"] == "Казань"
+    
+    other = dict(vacancy_data, title="Java Developer", description="Разработка микросервисов на Spring Boot")
+    response = client.post("/api/vacancies/?duplicates=reject", json=other)
+    assert response.status_code == 201
+    assert "X-Duplicate-Of" not in response.headers
+
+
+def test_resume_near_duplicates(client):
+    resume_data = {
+        "full_name": "Иванов Иван Иванович",
+        "position": "Python Developer",
+        "about": "Опытный разработчик на Python, люблю чистый код и тесты",
+        "location": "Москва",
+        "employment_type": "Полная",
+        "experience_years": "3-6 лет",
+        "email": "ivanov@example.com"
+    }
+    original_id = client.post("/api/resumes/", json=resume_data).json()["id"]
+    
+    response = client.post("/api/batch?duplicates=reject", json={"operations": [
+        {"entity": "resume", "action": "create", "data": dict(resume_data, about=resume_data["about"] + ".")},
+    ]})
+    assert response.status_code == 409
+    assert response.json()["results"][0]["duplicate_of"] == original_id
+    
+    client.delete(f"/api/resumes/{original_id}")
+    response = client.post("/api/resumes/?duplicates=reject", json=resume_data)
+    assert response.status_code == 201
+
+
+def test_batch_operations_database_error(client):
+    create_response = client.post("/api/vacancies/", json={
+        "title": "Old Title",
+        "company": "Test Company",
+        "description": "Test Description",
+        "location": "Москва",
+        "employment_type": "Полная",
+        "experience": "1-3 года"
+    })
+    vacancy_id = create_response.json()["id"]
+    
+    response = client.post("/api/batch", json={"operations": [
+        {"entity": "vacancy", "action": "update", "id": vacancy_id, "data": {"title": None}},
+    ]})
+    assert response.status_code == 400
+    data = response.json()
+    assert data["committed"] is False
+    assert data["results"][0]["status_code"] == 400
+    assert data["results"][0]["detail"] == "Данные нарушают ограничения базы данных"
+    assert client.get(f"/api/vacancies/{vacancy_id}").json()["title"] == "Old Title"
+    
+    response = client.get("/api/vacancies/batch?ids=" + ",".join(str(i) for i in range(101)))
+    assert response.status_code == 400
+    response = client.get("/api/vacancies/batch?ids=" + ",".join(["1"] * 200))
+    assert response.status_code == 200
+
+
+def make_vacancy(title, description, **extra):
+    return dict({
+        "title": title,
+        "company": "Tech Company",
+        "description": description,
+        "location": "Москва",
+        "employment_type": "Полная",
+        "experience": "3-6 лет"
+    }, **extra)
+
+
+BACKEND_TEXT = "Ищем опытного Python разработчика в команду бэкенда для развития платежного сервиса и внутренних инструментов компании"
+MOBILE_TEXT = "Нужен iOS разработчик со знанием Swift для поддержки мобильного приложения доставки и работы с дизайнерами продукта"
+
+
+def test_update_reindexes_vacancy(client):
+    vacancy_id = client.post("/api/vacancies/", json=make_vacancy("Python Developer", BACKEND_TEXT)).json()["id"]
+    
+    client.put(f"/api/vacancies/{vacancy_id}", json={"title": "iOS Developer", "description": MOBILE_TEXT})
+    
+    response = client.post("/api/vacancies/?duplicates=reject", json=make_vacancy("iOS Developer", MOBILE_TEXT + " срочно"))
+    assert response.status_code == 409
+    assert response.headers["X-Duplicate-Of"] == str(vacancy_id)
+    
+    response = client.post("/api/vacancies/?duplicates=reject", json=make_vacancy("Python Developer", BACKEND_TEXT))
+    assert response.status_code == 201
+
+
+def test_merge_after_original_changed(client):
+    original_id = client.post("/api/vacancies/", json=make_vacancy("Python Developer", BACKEND_TEXT)).json()["id"]
+    response = client.post("/api/vacancies/", json=make_vacancy("Python Developer", BACKEND_TEXT + " срочно"))
+    copy_id = response.json()["id"]
+    assert response.headers["X-Duplicate-Of"] == str(original_id)
+    
+    client.put(f"/api/vacancies/{original_id}", json={"title": "iOS Developer", "description": MOBILE_TEXT})
+    
+    response = client.post(
+        "/api/vacancies/?duplicates=merge",
+        json=make_vacancy("Python Developer", BACKEND_TEXT + " срочно", location="Казань")
+    )
+    assert response.status_code == 200
+    assert response.json()["id"] == copy_id
+    assert response.json()["location"] == "Казань"
+    assert client.get(f"/api/vacancies/{original_id}").json()["title"] == "iOS Developer"
+
+
+def test_batch_merge(client):
+    original_id = client.post("/api/vacancies/", json=make_vacancy("Python Developer", BACKEND_TEXT)).json()["id"]
+    
+    response = client.post("/api/batch?duplicates=merge", json={"operations": [
+        {"entity": "vacancy", "action": "create", "data": make_vacancy("Python Developer", BACKEND_TEXT + " срочно", salary_max=300000)},
+    ]})
+    assert response.status_code == 200
+    result = response.json()["results"][0]
+    assert result["status_code"] == 200
+    assert result["id"] == original_id
+    assert result["duplicate_of"] == original_id
+    
+    vacancies = client.get("/api/vacancies/").json()
+    assert len(vacancies) == 1
+    assert vacancies[0]["salary_max"] == 300000
+    assert vacancies[0]["description"].endswith("срочно")
+
+
+def test_merge_with_stale_index_entry(client):
+    original_id = client.post("/api/vacancies/", json=make_vacancy("Python Developer", BACKEND_TEXT)).json()["id"]
+    db = TestingSessionLocal()
+    db.query(database.Vacancy).filter(database.Vacancy.id == original_id).delete()
+    db.commit()
+    db.close()
+    
+    response = client.post("/api/vacancies/?duplicates=merge", json=make_vacancy("Python Developer", BACKEND_TEXT))
+    assert response.status_code == 201
+    assert "X-Duplicate-Of" not in response.headers
+
+
+def test_stale_index_entry_skipped_for_live_duplicate(client):
+    original_id = client.post("/api/vacancies/", json=make_vacancy("Python Developer", BACKEND_TEXT)).json()["id"]
+    copy_id = client.post("/api/vacancies/", json=make_vacancy("Python Developer", BACKEND_TEXT + " срочно")).json()["id"]
+    db = TestingSessionLocal()
+    db.query(database.Vacancy).filter(database.Vacancy.id == original_id).delete()
+    db.commit()
+    db.close()
+    
+    response = client.post("/api/vacancies/?duplicates=reject", json=make_vacancy("Python Developer", BACKEND_TEXT))
+    assert response.status_code == 409
+    assert response.headers["X-Duplicate-Of"] == str(copy_id)
+
+
+def test_merge_keeps_omitted_fields(client):
+    original = make_vacancy("Python Developer", BACKEND_TEXT, salary_min=100000, salary_max=200000, skills="Python")
+    original_id = client.post("/api/vacancies/", json=original).json()["id"]
+    
+    response = client.post(
+        "/api/vacancies/?duplicates=merge",
+        json=make_vacancy("Python Developer", BACKEND_TEXT + " срочно")
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == original_id
+    assert data["description"].endswith("срочно")
+    assert data["salary_min"] == 100000
+    assert data["salary_max"] == 200000
+    assert data["skills"] == "Python"
+
+
+def test_short_near_miss_is_not_duplicate(client):
+    client.post("/api/vacancies/", json=dict(make_vacancy("Java Developer", "Работа в офисе, Москва"), company="ACME"))
+    
+    response = client.post(
+        "/api/vacancies/?duplicates=reject",
+        json=dict(make_vacancy("Java Developer", "Работа в офисе, Казань"), company="ACME")
+    )
+    assert response.status_code == 201
+    assert "X-Duplicate-Of" not in response.headers
+
+
+def test_long_texts_compared_in_full(client):
+    boilerplate = " ".join(f"общее{i}" for i in range(dedup.MAX_TEXT_LENGTH // 6))
+    first = boilerplate + " " + " ".join(f"первое{i}" for i in range(300))
+    second = boilerplate + " " + " ".join(f"второе{i}" for i in range(300))
+    client.post("/api/vacancies/", json=make_vacancy("Python Developer", first))
+    
+    response = client.post("/api/vacancies/?duplicates=reject", json=make_vacancy("Python Developer", second))
+    assert response.status_code == 201
+
+
+def test_cluster_existing(client):
+    db = TestingSessionLocal()
+    rows = [
+        database.Vacancy(**make_vacancy("Python Developer", BACKEND_TEXT)),
+        database.Vacancy(**make_vacancy("iOS Developer", MOBILE_TEXT)),
+        database.Vacancy(**make_vacancy("Python Developer", BACKEND_TEXT + " срочно")),
+        database.Vacancy(**make_vacancy("Python Developer", BACKEND_TEXT + " срочно!")),
+    ]
+    db.add_all(rows)
+    db.commit()
+    ids = [row.id for row in rows]
+    
+    clusters = dedup.cluster_existing(db, "vacancy")
+    assert clusters == {ids[0]: [ids[2], ids[3]]}
+    
+    signatures = {
+        record.object_id: record.duplicate_of
+        for record in db.query(database.MinHashSignature).filter(database.MinHashSignature.entity == "vacancy")
+    }
+    assert signatures[ids[1]] is None
+    assert signatures[ids[2]] == ids[0]
+    db.close()
+    
+    response = client.post("/api/vacancies/?duplicates=reject", json=make_vacancy("iOS Developer", MOBILE_TEXT))
+    assert response.status_code == 409
+    assert response.headers["X-Duplicate-Of"] == str(ids[1])